@@ -1,8 +1,9 @@
 
 import asyncio
-import json
 import inspect
-from typing import Any
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple
+
+import orjson
 
 # Example client that calls the async tools directly by importing them
 # This file demonstrates how to interact with the simulated MCP tools in
@@ -15,6 +16,52 @@ from state_street_cdd import (
     generate_compliance_report,
 )
 
+# Tools exercised by the demo, keyed by the label printed with their result.
+# The profile comes first: its next_steps seed the follow-up chain.
+DEMO_TOOLS = {
+    "Customer profile": get_customer_profile,
+    "Risk score": get_risk_score,
+    "Risk explanation": explain_risk,
+    "Compliance report": generate_compliance_report,
+}
+
+# Upper bound on concurrent tool calls issued while following next_steps
+MAX_CONCURRENT_NEXT_STEPS = 8
+
+
+# How each tool object was resolved: the name of the attribute holding the
+# callable, or "" when the tool is called directly. Keyed by id(tool) so that
+# unhashable wrappers (fastmcp 2.x FunctionTool is a pydantic model) are cached
+# too. Each entry holds a strong reference to its tool, which pins the id so it
+# can't be reused by another object; the demo tools are module-level anyway.
+_resolved: Dict[int, Tuple[Any, str]] = {}
+
+# Attributes under which wrappers commonly keep the original function, and
+# invocation helpers they may expose instead, in probing order
+_FUNC_ATTRS = ("__wrapped__", "func", "fn", "function")
+_INVOKE_METHODS = ("call", "invoke", "run")
+# Tool wrapper types that must be unwrapped even if they happen to be callable
+_WRAPPER_TYPE_NAMES = ("FunctionTool",)
+
+
+def _pp(obj: Any) -> str:
+    """Pretty-print a tool result as indented JSON (orjson, UTF-8 preserved)"""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+
+
+def _remember(tool: Any, attr: str) -> None:
+    """Record how ``tool`` was resolved."""
+    _resolved[id(tool)] = (tool, attr)
+
+
+def _lookup(tool: Any) -> Optional[Callable]:
+    """Return the callable previously resolved for ``tool``, if any."""
+    entry = _resolved.get(id(tool))
+    if entry is None or entry[0] is not tool:
+        return None
+    attr = entry[1]
+    return getattr(tool, attr) if attr else tool
+
 
 async def _call_tool(tool: Any, *args, **kwargs):
     """Call a tool that may be wrapped by FastMCP.
@@ -24,32 +71,45 @@ async def _call_tool(tool: Any, *args, **kwargs):
     detect and call the original function: __wrapped__, func, fn, or
     callable attributes like call/invoke. It supports both sync and async
     underlying functions.
+
+    The callable that worked is remembered in ``_resolved`` so each tool only
+    pays for the attribute probing once.
     """
-    # 1) If the tool is a callable coroutine function or returns awaitable, just call
-    try:
-        if callable(tool):
-            res = tool(*args, **kwargs)
-            if inspect.isawaitable(res):
-                return await res
-            return res
-    except TypeError:
-        # Not callable (common for FunctionTool wrappers), fall through to other attempts
-        pass
+    # 0) Fast path: reuse the callable resolved on a previous invocation
+    fn = _lookup(tool)
+    if fn is not None:
+        res = fn(*args, **kwargs)
+        if inspect.isawaitable(res):
+            return await res
+        return res
+
+    # 1) Anything callable (functions, partials, lru_cache wrappers, ...) is
+    #    called directly. Only non-callable objects and known tool wrappers
+    #    such as FunctionTool go on to the attribute probes.
+    if callable(tool) and type(tool).__name__ not in _WRAPPER_TYPE_NAMES:
+        _remember(tool, "")
+        res = tool(*args, **kwargs)
+        if inspect.isawaitable(res):
+            return await res
+        return res
 
     # 2) Look for common attributes that store the original function
-    for attr in ("__wrapped__", "func", "fn", "function"):
+    for attr in _FUNC_ATTRS:
         if hasattr(tool, attr):
             orig = getattr(tool, attr)
             if callable(orig):
+                _remember(tool, attr)
                 res = orig(*args, **kwargs)
                 if inspect.isawaitable(res):
                     return await res
                 return res
 
     # 3) Look for invocation helpers like .call(), .invoke(), or .run()
-    for method in ("call", "invoke", "run"):
+    for method in _INVOKE_METHODS:
         if hasattr(tool, method) and callable(getattr(tool, method)):
-            res = getattr(tool, method)(*args, **kwargs)
+            helper = getattr(tool, method)
+            _remember(tool, method)
+            res = helper(*args, **kwargs)
             if inspect.isawaitable(res):
                 return await res
             return res
@@ -58,30 +118,92 @@ async def _call_tool(tool: Any, *args, **kwargs):
     raise TypeError(f"Tool object of type {type(tool)!r} is not callable and no underlying function was found")
 
 
+async def safe_gather(*coros, timeout: float = 30):
+    """Run coroutines concurrently and return their results in order.
+
+    A coroutine that raises yields its exception in place of a result instead
+    of cancelling its siblings, so callers always get partial results. The
+    whole batch is bounded by ``timeout`` seconds: anything still running then
+    is cancelled and its slot holds a TimeoutError, while finished slots keep
+    their results.
+    """
+    tasks = [asyncio.ensure_future(c) for c in coros]
+    if not tasks:
+        return []
+    _, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    if pending:
+        # let the cancelled tasks unwind before reporting them
+        await asyncio.wait(pending)
+
+    results = []
+    for task in tasks:
+        if task in pending:
+            results.append(asyncio.TimeoutError(f"timed out after {timeout}s"))
+        elif task.cancelled():
+            results.append(asyncio.CancelledError())
+        else:
+            results.append(task.exception() or task.result())
+    return results
+
+
+def _print_results(labels, results) -> None:
+    """Print each labelled tool result, or the error it failed with."""
+    for i, (label, result) in enumerate(zip(labels, results)):
+        prefix = "\n" if i else ""
+        if isinstance(result, BaseException):
+            print(f"{prefix}{label} failed: {result}")
+        else:
+            print(f"{prefix}{label}:\n", _pp(result))
+
+
 async def run_demo(customer_id: str = "CUST-12345"):
-    # Call the simulated MCP tools via the robust helper above
-    profile = await _call_tool(get_customer_profile, customer_id)
-    score = await _call_tool(get_risk_score, customer_id)
-    explanation = await _call_tool(explain_risk, customer_id)
-    report = await _call_tool(generate_compliance_report, customer_id)
+    # Call the simulated MCP tools via the robust helper above; the calls are
+    # independent so they run concurrently, and a failing tool doesn't cancel
+    # its siblings.
+    results = await safe_gather(*(_call_tool(tool, customer_id) for tool in DEMO_TOOLS.values()))
 
     print("\n--- Example client results (local import) ---\n")
-    print("Customer profile:\n", json.dumps(profile, indent=2, ensure_ascii=False))
-    print("\nRisk score:\n", json.dumps(score, indent=2, ensure_ascii=False))
-    print("\nRisk explanation:\n", json.dumps(explanation, indent=2, ensure_ascii=False))
-    print("\nCompliance report:\n", json.dumps(report, indent=2, ensure_ascii=False))
+    _print_results(DEMO_TOOLS, results)
     # Follow next_steps returned by the profile to exercise server-side chaining
-    await follow_next_steps(profile)
+    profile = results[0]
+    if isinstance(profile, dict):
+        await follow_next_steps(profile)
+
+
+def _step_signature(tool_name: str, params: Dict[str, Any]) -> Optional[Tuple[str, bytes]]:
+    """Canonical (tool, params) key used to detect repeated next_step calls.
+
+    Params are serialized with sorted keys so nested lists/dicts are supported.
+    Returns None for params orjson cannot serialize; such steps are not deduplicated.
+    """
+    try:
+        return tool_name, orjson.dumps(params, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    except TypeError:
+        return None
 
 
-async def follow_next_steps(result: dict, max_depth: int = 4, _depth: int = 0):
+async def follow_next_steps(
+    result: dict,
+    max_depth: int = 4,
+    visited: Optional[FrozenSet[Tuple[str, bytes]]] = None,
+    _depth: int = 0,
+    _sem: Optional[asyncio.Semaphore] = None,
+):
     """Follow structured next_steps from a tool result and invoke any referenced tools.
 
     Each next_step can be:
     - a string (human action) -> printed and ignored for chaining
     - a dict with 'tool' (name) and optional 'params' dict -> client will call the corresponding tool
 
-    This helper prevents infinite loops using max_depth.
+    Tool steps within one result are independent, so they are dispatched
+    concurrently and their results are followed in parallel. A semaphore shared
+    across the whole chain bounds the number of in-flight tool calls.
+
+    This helper prevents infinite loops using max_depth. It also tracks the
+    (tool, params) calls already made along the chain in ``visited`` and skips
+    a step that would repeat one of them.
     """
     if _depth >= max_depth:
         print(f"Max next-step depth {_depth} reached, stopping further chaining.")
@@ -91,6 +213,11 @@ async def follow_next_steps(result: dict, max_depth: int = 4, _depth: int = 0):
     if not steps:
         return
 
+    if visited is None:
+        visited = frozenset()
+    if _sem is None:
+        _sem = asyncio.Semaphore(MAX_CONCURRENT_NEXT_STEPS)
+
     tool_map = {
         "get_customer_profile": get_customer_profile,
         "get_risk_score": get_risk_score,
@@ -98,10 +225,12 @@ async def follow_next_steps(result: dict, max_depth: int = 4, _depth: int = 0):
         "generate_compliance_report": generate_compliance_report,
     }
 
+    calls = []
+    sigs = set()
     for step in steps:
         if isinstance(step, dict) and step.get("tool"):
             tool_name = step["tool"]
-            params = step.get("params", {})
+            params = dict(step.get("params", {}))
             # if customer_id not provided in params, use parent's customer_id when available
             if "customer_id" not in params and "customer_id" in result:
                 params["customer_id"] = result["customer_id"]
@@ -111,66 +240,88 @@ async def follow_next_steps(result: dict, max_depth: int = 4, _depth: int = 0):
                 print(f"Unknown tool referenced in next_steps: {tool_name}")
                 continue
 
+            sig = _step_signature(tool_name, params)
+            if sig is not None:
+                if sig in visited or sig in sigs:
+                    print(f"Skipping next_step {tool_name} with params={params}: already called in this chain")
+                    continue
+                sigs.add(sig)
+
             print(f"\n-- Following next_step: calling {tool_name} with params={params} (depth {_depth+1})")
-            try:
-                resp = await _call_tool(func, **params)
-                print(f"Result from {tool_name}:", json.dumps(resp, indent=2, ensure_ascii=False))
-                # recursively follow next steps
-                await follow_next_steps(resp, max_depth=max_depth, _depth=_depth + 1)
-            except Exception as e:
-                print(f"Error when calling {tool_name}: {e}")
+            calls.append((tool_name, func, params))
 
         else:
             # plain string next-step, print for human ops
             print(f"Next action (human): {step}")
 
+    if not calls:
+        return
+
+    async def _bounded_call(func, params):
+        async with _sem:
+            return await _call_tool(func, **params)
+
+    results = await safe_gather(*(_bounded_call(func, params) for _, func, params in calls))
+
+    children = []
+    for (tool_name, _, _), resp in zip(calls, results):
+        if isinstance(resp, BaseException):
+            print(f"Error when calling {tool_name}: {resp}")
+            continue
+        print(f"Result from {tool_name}:", _pp(resp))
+        children.append(resp)
+
+    # recursively follow next steps of every child in parallel
+    child_visited = visited | sigs
+    await asyncio.gather(
+        *(
+            follow_next_steps(resp, max_depth=max_depth, visited=child_visited, _depth=_depth + 1, _sem=_sem)
+            for resp in children
+        )
+    )
+
 
 # The example client now calls server-side scenarios directly; local transform helpers removed
 
 
 async def run_scenarios(customer_id: str = "CUST-12345"):
     """Run positive and negative scenario simulations for each tool and print outputs."""
-    # call the base tools
-    profile = await _call_tool(get_customer_profile, customer_id)
-    score = await _call_tool(get_risk_score, customer_id)
-    explanation = await _call_tool(explain_risk, customer_id)
-    report = await _call_tool(generate_compliance_report, customer_id)
-
     # Query the tools for both *server-side* scenarios so we validate server behavior
     # Use different customer IDs to indicate scenario. No explicit scenario parameter required.
+    # The base customer is already covered by run_demo, so it is not fetched again here.
     pos_customer = f"{customer_id}-POS"
     neg_customer = f"{customer_id}-NEG"
 
-    pos_profile = await _call_tool(get_customer_profile, pos_customer)
-    pos_score = await _call_tool(get_risk_score, pos_customer)
-    pos_expl = await _call_tool(explain_risk, pos_customer)
-    pos_report = await _call_tool(generate_compliance_report, pos_customer)
-
-    neg_profile = await _call_tool(get_customer_profile, neg_customer)
-    neg_score = await _call_tool(get_risk_score, neg_customer)
-    neg_expl = await _call_tool(explain_risk, neg_customer)
-    neg_report = await _call_tool(generate_compliance_report, neg_customer)
+    # All eight calls are independent, so issue them in a single gather
+    customers = (pos_customer, neg_customer)
+    results = await safe_gather(
+        *(_call_tool(tool, cid) for cid in customers for tool in DEMO_TOOLS.values())
+    )
+    n = len(DEMO_TOOLS)
+    pos_results, neg_results = results[:n], results[n:]
 
     print("\n================== POSITIVE SCENARIO ==================")
-    print("Customer profile:\n", json.dumps(pos_profile, indent=2, ensure_ascii=False))
-    print("\nRisk score:\n", json.dumps(pos_score, indent=2, ensure_ascii=False))
-    print("\nRisk explanation:\n", json.dumps(pos_expl, indent=2, ensure_ascii=False))
-    print("\nCompliance report:\n", json.dumps(pos_report, indent=2, ensure_ascii=False))
+    _print_results(DEMO_TOOLS, pos_results)
     # follow chain from profile for the positive scenario
-    await follow_next_steps(pos_profile)
+    if isinstance(pos_results[0], dict):
+        await follow_next_steps(pos_results[0])
 
     print("\n================== NEGATIVE SCENARIO ==================")
-    print("Customer profile:\n", json.dumps(neg_profile, indent=2, ensure_ascii=False))
-    print("\nRisk score:\n", json.dumps(neg_score, indent=2, ensure_ascii=False))
-    print("\nRisk explanation:\n", json.dumps(neg_expl, indent=2, ensure_ascii=False))
-    print("\nCompliance report:\n", json.dumps(neg_report, indent=2, ensure_ascii=False))
+    _print_results(DEMO_TOOLS, neg_results)
     # follow chain from profile for the negative scenario
-    await follow_next_steps(neg_profile)
+    if isinstance(neg_results[0], dict):
+        await follow_next_steps(neg_results[0])
+
+
+async def _main():
+    # Run both passes on one event loop, one after the other so each section's
+    # output stays under its own banner. The calls inside each pass still run
+    # concurrently.
+    await run_demo()
+    print('\n\n***** Now running comprehensive positive/negative scenario tests *****\n')
+    await run_scenarios()
 
 
 if __name__ == "__main__":
-    # Run the demo client using asyncio event loop
     # Run the demo client then run the comprehensive positive/negative scenario test
-    asyncio.run(run_demo())
-    print('\n\n***** Now running comprehensive positive/negative scenario tests *****\n')
-    asyncio.run(run_scenarios())
+    asyncio.run(_main())
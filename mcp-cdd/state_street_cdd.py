@@ -1,5 +1,9 @@
 import os
-from typing import Dict, Any
+import asyncio
+import functools
+from collections import OrderedDict
+from typing import Dict, Any, Tuple
+import orjson
 from fastmcp import FastMCP
 from starlette.middleware import Middleware
 from starlette.middleware.cors import CORSMiddleware
@@ -8,6 +12,7 @@ from starlette.middleware.cors import CORSMiddleware
 mcp = FastMCP("StateStreet CDD Service")
 
 
+@functools.lru_cache(maxsize=4096)
 def _infer_scenario_for_customer(customer_id: str) -> str:
     """Infer 'positive' or 'negative' scenario from the customer_id string.
 
@@ -26,7 +31,85 @@ def _infer_scenario_for_customer(customer_id: str) -> str:
     return "positive"
 
 
+# Static parts of the simulated responses, built once at import time.
+# Tools copy these into each response so the constants are never mutated.
+_BASE_PROFILE_TEMPLATE = {
+    "name": "ACME Corp",
+    "country": "US",
+    "incorporation_date": "2010-07-16",
+    "industry": "Financial Services",
+}
+_CONTACTS = ({"name": "Jane Doe", "role": "Compliance Officer", "email": "jane.doe@example.com"},)
+
+_FACTORS = {
+    "sanctions": 5,
+    "geo_risk": 12,
+    "industry_risk": 20,
+    "transaction_pattern": 35
+}
+# The factors are fixed, so both scenario scores can be evaluated up front
+_FACTORS_TOTAL = sum(_FACTORS.values())
+_NEG_SCORE = min(100, int(_FACTORS_TOTAL * 2.0))
+_POS_SCORE = max(0, int(_FACTORS_TOTAL * 0.3))
+
+_NEG_PROFILE_NEXT_STEPS = ("Collect additional KYC", "Enhanced monitoring", "Escalate to AML officer")
+_POS_PROFILE_NEXT_STEPS = ("Standard monitoring", "Periodic review in 12 months")
+
+_NEG_OPEN_ISSUES = (
+    {"id": "ISS-01", "description": "Multiple high-value transfers to flagged jurisdictions"},
+    {"id": "ISS-02", "description": "Possible mismatch in beneficial owner documentation"}
+)
+
+
+# In-memory LRU response cache for the tools below. Every tool is a deterministic
+# function of customer_id, so results are keyed by (tool_name, customer_id).
+# Results are stored serialized with orjson: decoding yields a fresh copy about
+# as cheaply as recomputing the response, and the byte length gives result_size.
+# Each entry also records access_count. The least recently used entry is
+# evicted once _CACHE_MAXSIZE is exceeded, so distinct ids can't grow memory
+# without bound.
+_CACHE_MAXSIZE = 1024
+_cache: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+_cache_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+
+def _cached(func):
+    """Cache a tool's result per customer_id.
+
+    Concurrent calls for the same key are coalesced behind a per-key lock so
+    only one of them computes the result; the lock is dropped once the call
+    finishes. Callers receive a fresh copy, so mutating a returned dict never
+    affects the cached value. Results are only stored when the tool returns
+    successfully.
+    """
+    @functools.wraps(func)
+    async def wrapper(customer_id: str) -> Dict[str, Any]:
+        key = (func.__name__, customer_id)
+        entry = _cache.get(key)
+        if entry is not None:
+            _cache.move_to_end(key)
+        else:
+            lock = _cache_locks.setdefault(key, asyncio.Lock())
+            try:
+                async with lock:
+                    entry = _cache.get(key)
+                    if entry is None:
+                        data = orjson.dumps(await func(customer_id))
+                        entry = {"data": data, "access_count": 0, "result_size": len(data)}
+                        _cache[key] = entry
+                        if len(_cache) > _CACHE_MAXSIZE:
+                            _cache.popitem(last=False)
+            finally:
+                # Callers already waiting keep their own reference to the lock
+                _cache_locks.pop(key, None)
+        entry["access_count"] += 1
+        return orjson.loads(entry["data"])
+
+    return wrapper
+
+
 @mcp.tool()
+@_cached
 async def get_customer_profile(customer_id: str) -> Dict[str, Any]:
     """
     Get profile of the customer
@@ -35,11 +118,8 @@ async def get_customer_profile(customer_id: str) -> Dict[str, Any]:
     # Simulate a customer profile with two scenario variants
     base = {
         "customer_id": customer_id,
-        "name": "ACME Corp",
-        "country": "US",
-        "incorporation_date": "2010-07-16",
-        "industry": "Financial Services",
-        "contacts": [{"name": "Jane Doe", "role": "Compliance Officer", "email": "jane.doe@example.com"}]
+        **_BASE_PROFILE_TEMPLATE,
+        "contacts": [dict(c) for c in _CONTACTS]
     }
 
     scenario = _infer_scenario_for_customer(customer_id)
@@ -56,16 +136,13 @@ async def get_customer_profile(customer_id: str) -> Dict[str, Any]:
     # next_steps are structured: they can contain strings (human actions) or tool calls
     if scenario == "negative":
         base["next_steps"] = [
-            "Collect additional KYC",
-            "Enhanced monitoring",
-            "Escalate to AML officer",
+            *_NEG_PROFILE_NEXT_STEPS,
             {"tool": "get_risk_score", "params": {"customer_id": customer_id}},
             {"tool": "generate_compliance_report", "params": {"customer_id": customer_id}}
         ]
     else:
         base["next_steps"] = [
-            "Standard monitoring",
-            "Periodic review in 12 months",
+            *_POS_PROFILE_NEXT_STEPS,
             {"tool": "get_risk_score", "params": {"customer_id": customer_id}},
             {"tool": "generate_compliance_report", "params": {"customer_id": customer_id}}
         ]
@@ -74,6 +151,7 @@ async def get_customer_profile(customer_id: str) -> Dict[str, Any]:
 
 
 @mcp.tool()
+@_cached
 async def get_risk_score(customer_id: str) -> Dict[str, Any]:
     """
     Get risk score of the customer
@@ -84,19 +162,13 @@ async def get_risk_score(customer_id: str) -> Dict[str, Any]:
     baseline = {
         "customer_id": customer_id,
         "scale": "0-100",
-        "factors": {
-            "sanctions": 5,
-            "geo_risk": 12,
-            "industry_risk": 20,
-            "transaction_pattern": 35
-        }
+        "factors": dict(_FACTORS)
     }
 
     scenario = _infer_scenario_for_customer(customer_id)
     if scenario == "negative":
-        score = int(sum(baseline["factors"].values()) * 2.0)
         baseline.update({
-            "score": min(100, score),
+            "score": _NEG_SCORE,
             "interpretation": "High risk",
             "recommendation": ["Immediate enhanced due diligence", "Transaction restrictions until cleared"],
             "next_steps": [
@@ -108,7 +180,7 @@ async def get_risk_score(customer_id: str) -> Dict[str, Any]:
             ]
         })
     else:
-        score = max(0, int(sum(baseline["factors"].values()) * 0.3))
+        score = _POS_SCORE
         baseline.update({
             "score": score,
             "interpretation": "Low risk" if score < 30 else "Moderate risk",
@@ -124,6 +196,7 @@ async def get_risk_score(customer_id: str) -> Dict[str, Any]:
 
 
 @mcp.tool()
+@_cached
 async def explain_risk(customer_id: str) -> Dict[str, Any]:
     """
     Explain the risk of the customer
@@ -163,6 +236,7 @@ async def explain_risk(customer_id: str) -> Dict[str, Any]:
 
 
 @mcp.tool()
+@_cached
 async def generate_compliance_report(customer_id: str) -> Dict[str, Any]:
     """
     Generate compliance report for the given customer
@@ -179,10 +253,7 @@ async def generate_compliance_report(customer_id: str) -> Dict[str, Any]:
         report["summary"] = {
             "kyc_verified": False,
             "aml_checks_passed": False,
-            "open_issues": [
-                {"id": "ISS-01", "description": "Multiple high-value transfers to flagged jurisdictions"},
-                {"id": "ISS-02", "description": "Possible mismatch in beneficial owner documentation"}
-            ]
+            "open_issues": [dict(issue) for issue in _NEG_OPEN_ISSUES]
         }
         report["next_steps"] = [
             "Freeze account pending investigation",
@@ -1,6 +1,7 @@
 
 import os
 from typing import Optional, Dict, List, Any
+import anyio
 import httpx
 from fastmcp import FastMCP
 from starlette.middleware import Middleware
@@ -20,6 +21,28 @@ load_dotenv()
 # Initialize FastMCP server
 mcp = FastMCP("OCR Service")
 
+# Tencent Cloud OCR client, built once on first use and reused for every request
+_ocr_client: Optional[ocr_client.OcrClient] = None
+
+
+def get_ocr_client() -> ocr_client.OcrClient:
+    """Get the shared Tencent Cloud OCR client, creating it if needed"""
+    global _ocr_client
+    if _ocr_client is None:
+        # Get the Tencent Cloud credentials from environment variables   
+        cred = credential.Credential(os.getenv("TENCENTCLOUD_SECRET_ID"), os.getenv("TENCENTCLOUD_SECRET_KEY"))
+        #
+        httpProfile = HttpProfile()
+        httpProfile.endpoint = "ocr.tencentcloudapi.com"
+
+        # Instantiate a client option, optional, can be skipped if there are no special requirements
+        clientProfile = ClientProfile()
+        clientProfile.httpProfile = httpProfile
+        # Instantiate the client object for the product to be requested, clientProfile is optional
+        _ocr_client = ocr_client.OcrClient(cred, "", clientProfile)
+    return _ocr_client
+
+
 @mcp.tool()
 async def invoice_ocr(
     image_url: str,
@@ -34,34 +57,23 @@ async def invoice_ocr(
     :return: Response from the OCR service.
     """
     try:
-        # Get the Tencent Cloud credentials from environment variables   
-        cred = credential.Credential(os.getenv("TENCENTCLOUD_SECRET_ID"), os.getenv("TENCENTCLOUD_SECRET_KEY"))
-        #
-        httpProfile = HttpProfile()
-        httpProfile.endpoint = "ocr.tencentcloudapi.com"
-
-        # Instantiate a client option, optional, can be skipped if there are no special requirements
-        clientProfile = ClientProfile()
-        clientProfile.httpProfile = httpProfile
-        # Instantiate the client object for the product to be requested, clientProfile is optional
-        client = ocr_client.OcrClient(cred, "", clientProfile)
+        client = get_ocr_client()
 
         # Instantiate a request object, each interface corresponds to a request object
         req = models.RecognizeGeneralInvoiceRequest()
-        params = {
-            "ImageUrl": image_url,
-            "EnablePdf": enable_pdf
-        }
-        req.from_json_string(json.dumps(params))
+        req.ImageUrl = image_url
+        req.EnablePdf = enable_pdf
 
         # The returned resp is an instance of RecognizeGeneralInvoiceResponse, corresponding to the request object
-        resp = client.RecognizeGeneralInvoice(req)
-        # Output the response in JSON format
-        print(resp.to_json_string())
-        return resp.to_json_string()
+        # The SDK call is blocking, so run it in a worker thread to keep the event loop serving other sessions
+        resp = await anyio.to_thread.run_sync(client.RecognizeGeneralInvoice, req)
+        # Output the response in JSON format and return it as a dict
+        result = resp.to_json_string()
+        print(result)
+        return json.loads(result)
     except TencentCloudSDKException as err:
         print(err)
-        return resp.to_json_string()
+        return {"error": str(err)}
     
     except httpx.HTTPStatusError as e:
         return {"error": str(e)}
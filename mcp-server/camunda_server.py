@@ -3,27 +3,83 @@ Camunda MCP Server using FastMCP
 Provides tools to interact with Camunda BPM Platform via REST API
 """
 
+import asyncio
 import os
 from typing import Optional, Dict, List, Any
+from urllib.parse import unquote, urlsplit
 import httpx
+import orjson
 from fastmcp import FastMCP
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Initialize FastMCP server
-mcp = FastMCP("Camunda BPM")
-
 # Camunda configuration
 CAMUNDA_URL = os.getenv("CAMUNDA_URL", "http://localhost:8080/engine-rest")
 CAMUNDA_USER = os.getenv("CAMUNDA_USER", "demo")
 CAMUNDA_PASSWORD = os.getenv("CAMUNDA_PASSWORD", "demo")
 
+# Authentication tuple for Camunda API, computed once from the configuration above
+_AUTH = (CAMUNDA_USER, CAMUNDA_PASSWORD) if CAMUNDA_USER and CAMUNDA_PASSWORD else None
+
+# Camunda variable type used for all submitted variables
+_STRING_TYPE = "String"
+
+# Maximum number of concurrent requests issued by camunda_batch_get
+BATCH_MAX_CONCURRENCY = 10
+
+# Shared HTTP client, created on first use so connections stay alive across tool calls
+_client: Optional[httpx.AsyncClient] = None
 
-def get_auth():
-    """Get authentication tuple for Camunda API"""
-    return (CAMUNDA_USER, CAMUNDA_PASSWORD) if CAMUNDA_USER and CAMUNDA_PASSWORD else None
+
+def get_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client for Camunda API, creating it if needed"""
+    global _client
+    # No await between the check and the assignment, so concurrent tasks
+    # on the event loop cannot both create a client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=CAMUNDA_URL,
+            auth=_AUTH,
+            timeout=httpx.Timeout(connect=5.0, read=30.0, write=10.0, pool=5.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared HTTP client; called once at process exit"""
+    global _client
+    if _client is not None:
+        client, _client = _client, None
+        await client.aclose()
+
+
+# Initialize FastMCP server. The shared client is not closed from a FastMCP
+# lifespan: in fastmcp 2.x that runs once per session, so one client
+# disconnecting would close the client for every other session.
+mcp = FastMCP("Camunda BPM")
+
+
+def to_camunda_variables(variables: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Convert a simple {name: value} dict to Camunda's typed variable format"""
+    return {name: {"value": value, "type": _STRING_TYPE} for name, value in variables.items()}
+
+
+def validate_endpoint(endpoint: str) -> str:
+    """Ensure an endpoint stays under CAMUNDA_URL.
+
+    The shared client sends the Camunda credentials with every request, and
+    httpx does not join absolute URLs onto base_url, so endpoints with a
+    scheme or host, backslashes, or '..' path segments are rejected.
+    """
+    parts = urlsplit(endpoint)
+    if parts.scheme or parts.netloc or endpoint.startswith("//") or "\\" in endpoint:
+        raise ValueError(f"Endpoint must be a path relative to the Camunda REST API: {endpoint!r}")
+    if ".." in unquote(parts.path).split("/"):
+        raise ValueError(f"Endpoint must not contain '..' path segments: {endpoint!r}")
+    return endpoint
 
 
 async def camunda_request(
@@ -33,20 +89,16 @@ async def camunda_request(
     json_data: Optional[Dict] = None
 ) -> Any:
     """Make a request to Camunda REST API"""
-    url = f"{CAMUNDA_URL}/{endpoint}"
-    auth = get_auth()
-    
-    async with httpx.AsyncClient() as client:
-        response = await client.request(
-            method=method,
-            url=url,
-            auth=auth,
-            params=params,
-            json=json_data,
-            timeout=30.0
-        )
-        response.raise_for_status()
-        return response.json() if response.text else None
+    response = await get_client().request(
+        method=method,
+        url=validate_endpoint(endpoint),
+        params=params,
+        json=json_data
+    )
+    response.raise_for_status()
+    # Parse the raw bytes directly; response.text/.json() would decode the whole body to str first
+    data = response.content
+    return orjson.loads(data) if data else None
 
 
 @mcp.tool()
@@ -120,10 +172,7 @@ async def start_process_instance(
     
     if variables:
         # Convert simple dict to Camunda variable format
-        payload["variables"] = {
-            name: {"value": value, "type": "String"} 
-            for name, value in variables.items()
-        }
+        payload["variables"] = to_camunda_variables(variables)
     
     return await camunda_request(
         f"process-definition/key/{key}/start",
@@ -267,10 +316,7 @@ async def complete_task(
     payload = {}
     
     if variables:
-        payload["variables"] = {
-            name: {"value": value, "type": "String"} 
-            for name, value in variables.items()
-        }
+        payload["variables"] = to_camunda_variables(variables)
     
     await camunda_request(
         f"task/{task_id}/complete",
@@ -328,6 +374,40 @@ async def get_process_variables(instance_id: str) -> Dict:
     return await camunda_request(f"process-instance/{instance_id}/variables")
 
 
+@mcp.tool()
+async def camunda_batch_get(requests: List[Dict[str, Any]]) -> List[Any]:
+    """
+    Fetch several Camunda resources concurrently in one call.
+    
+    Args:
+        requests: List of requests, each a dict with an 'endpoint' (e.g.
+            "process-instance/<id>" or "task/<id>/variables") and optional 'params'
+    
+    Returns:
+        List of results in the same order as the requests. A failed request
+        yields {"error": "<message>"} instead of its result.
+    """
+    # Cap in-flight requests well below the client's connection limit so a
+    # large batch queues here instead of failing with PoolTimeout
+    semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+
+    async def fetch(spec: Any) -> Any:
+        # Validate inside the task so a malformed spec only fails its own slot
+        if not isinstance(spec, dict) or not spec.get("endpoint"):
+            raise ValueError(f"Batch request must be a dict with an 'endpoint': {spec!r}")
+        async with semaphore:
+            return await camunda_request(spec["endpoint"], params=spec.get("params"))
+
+    results = await asyncio.gather(
+        *(fetch(spec) for spec in requests),
+        return_exceptions=True
+    )
+    return [
+        {"error": str(result)} if isinstance(result, Exception) else result
+        for result in results
+    ]
+
+
 @mcp.tool()
 async def deploy_bpmn(
     deployment_name: str,
@@ -343,30 +423,30 @@ async def deploy_bpmn(
     Returns:
         Deployment details
     """
-    import aiofiles
-    
-    async with aiofiles.open(bpmn_file_path, 'rb') as f:
-        content = await f.read()
-    
-    files = {
-        'data': (os.path.basename(bpmn_file_path), content, 'application/xml')
-    }
-    
-    url = f"{CAMUNDA_URL}/deployment/create"
-    auth = get_auth()
-    
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            url,
-            auth=auth,
+    # Hand httpx the open file so the multipart body is streamed from disk
+    # in chunks instead of reading the whole BPMN bundle into memory first
+    with open(bpmn_file_path, 'rb') as f:
+        files = {
+            'data': (os.path.basename(bpmn_file_path), f, 'application/xml')
+        }
+        
+        response = await get_client().post(
+            "deployment/create",
             files=files,
-            data={'deployment-name': deployment_name},
-            timeout=30.0
+            data={'deployment-name': deployment_name}
         )
-        response.raise_for_status()
-        return response.json()
+    response.raise_for_status()
+    return orjson.loads(response.content)
 
 
 if __name__ == "__main__":
     # Run the MCP server in HTTP SSE mode
-    mcp.run(transport="streamable-http", host="0.0.0.0", port=8000, path="/mcp")
+    try:
+        mcp.run(transport="streamable-http", host="0.0.0.0", port=8000, path="/mcp")
+    finally:
+        try:
+            asyncio.run(close_client())
+        except RuntimeError:
+            # Pooled connections belonged to the server's event loop, which
+            # has already shut down; the process is exiting anyway
+            pass